@@ -0,0 +1,223 @@
+import os
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from postings_store import get_store, EPOCH
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "projects.db")
+# Kept out of projects.db so saving searches or reading digests never invalidates the postings snapshot
+ALERTS_DB = os.path.join(BASE_DIR, "alerts.db")
+GRAM = 3   # saved keyword searches are indexed by their first GRAM characters
+
+# --- DATABASE LOGIC ---
+def init_change_log(db_path=DB_PATH):
+    """Adds the posting_changes log and its triggers to the postings DB. Any insert or
+    content update of a posting is appended there, so alert evaluation only ever
+    reads what changed since its watermark."""
+    if not os.path.exists(db_path): return 0
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS posting_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            posting_id INTEGER
+        )
+    """)
+    # Triggers are dropped whenever a loader replaces the postings table, so recreate them every time
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='postings'")
+    if cur.fetchone():
+        cur.executescript("""
+            CREATE TRIGGER IF NOT EXISTS postings_log_insert AFTER INSERT ON postings
+            BEGIN INSERT INTO posting_changes (posting_id) VALUES (NEW.rowid); END;
+            CREATE TRIGGER IF NOT EXISTS postings_log_update AFTER UPDATE OF institute_code, title, skills, deadline ON postings
+            BEGIN INSERT INTO posting_changes (posting_id) VALUES (NEW.rowid); END;
+        """)
+    conn.commit()
+    head = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM posting_changes").fetchone()[0]
+    conn.close()
+    return head
+
+def init_alerts(alerts_db=ALERTS_DB, db_path=DB_PATH):
+    head = init_change_log(db_path)
+    conn = sqlite3.connect(alerts_db)
+    cur = conn.cursor()
+    # Digests created before the link joined the dedupe key are rebuilt once
+    row = cur.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='alert_digest'").fetchone()
+    legacy_digest = bool(row) and "UNIQUE (search_id, posting_id)" in row[0]
+    if legacy_digest:
+        cur.execute("ALTER TABLE alert_digest RENAME TO alert_digest_old")
+    cur.executescript("""
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            city TEXT,
+            institute TEXT,
+            skills TEXT,
+            deadline_days INTEGER,
+            created_on DATE
+        );
+        CREATE TABLE IF NOT EXISTS alert_digest (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            search_id INTEGER,
+            posting_id INTEGER,
+            title TEXT,
+            institute TEXT,
+            link TEXT,
+            deadline TEXT,
+            matched_on DATE,
+            seen INTEGER DEFAULT 0,
+            -- postings has no AUTOINCREMENT, so a purged rowid can come back as a different posting
+            UNIQUE (search_id, posting_id, link)
+        );
+        CREATE INDEX IF NOT EXISTS idx_alert_digest_user ON alert_digest (user, seen);
+        CREATE TABLE IF NOT EXISTS alert_state (
+            name TEXT PRIMARY KEY,
+            value INTEGER
+        );
+    """)
+    if legacy_digest:
+        cur.executescript("""
+            INSERT INTO alert_digest SELECT * FROM alert_digest_old;
+            DROP TABLE alert_digest_old;
+            CREATE INDEX IF NOT EXISTS idx_alert_digest_user ON alert_digest (user, seen);
+        """)
+    # A fresh watermark starts at the current end of the log: existing postings don't trigger alerts
+    cur.execute("INSERT OR IGNORE INTO alert_state (name, value) VALUES ('watermark', ?)", (head,))
+    conn.commit()
+    conn.close()
+
+def save_search(user, city="", institute="", skills="", deadline_days=None, alerts_db=ALERTS_DB):
+    init_alerts(alerts_db)
+    conn = sqlite3.connect(alerts_db)
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO saved_searches (user, city, institute, skills, deadline_days, created_on)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (user, city or None, institute or None, (skills or "").strip().lower() or None,
+          deadline_days, datetime.now().strftime('%Y-%m-%d')))
+    search_id = cur.lastrowid
+    conn.commit()
+    conn.close()
+    return search_id
+
+def list_searches(user, alerts_db=ALERTS_DB):
+    init_alerts(alerts_db)
+    conn = sqlite3.connect(alerts_db)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute("SELECT * FROM saved_searches WHERE user = ? ORDER BY id", (user,))]
+    conn.close()
+    return rows
+
+def delete_search(search_id, user, alerts_db=ALERTS_DB):
+    init_alerts(alerts_db)
+    conn = sqlite3.connect(alerts_db)
+    cur = conn.cursor()
+    cur.execute("DELETE FROM saved_searches WHERE id = ? AND user = ?", (search_id, user))
+    deleted = cur.rowcount
+    cur.execute("DELETE FROM alert_digest WHERE search_id = ? AND user = ?", (search_id, user))
+    conn.commit()
+    conn.close()
+    return deleted > 0
+
+def get_digest(user, unseen_only=True, mark_seen=False, alerts_db=ALERTS_DB):
+    init_alerts(alerts_db)
+    conn = sqlite3.connect(alerts_db)
+    conn.row_factory = sqlite3.Row
+    query = "SELECT * FROM alert_digest WHERE user = ?" + (" AND seen = 0" if unseen_only else "") + " ORDER BY id DESC"
+    rows = [dict(r) for r in conn.execute(query, (user,))]
+    if mark_seen and rows:
+        conn.execute("UPDATE alert_digest SET seen = 1 WHERE user = ? AND seen = 0", (user,))
+        conn.commit()
+    conn.close()
+    return rows
+
+# --- INVERTED QUERY INDEX ---
+class SearchIndex:
+    """Saved searches keyed by their most selective criterion: a keyword prefix,
+    else the institute, else the city. A posting only tests the searches whose
+    key it contains, and each candidate is then checked against every criterion."""
+
+    def __init__(self, searches):
+        self.searches = {s['id']: s for s in searches}
+        self.by_gram, self.by_institute, self.by_city = defaultdict(list), defaultdict(list), defaultdict(list)
+        self.unkeyed = []
+        for s in searches:
+            if s['skills']: self.by_gram[s['skills'][:GRAM]].append(s['id'])
+            elif s['institute']: self.by_institute[s['institute']].append(s['id'])
+            elif s['city']: self.by_city[s['city']].append(s['id'])
+            else: self.unkeyed.append(s['id'])
+
+    def candidates(self, item, text):
+        found = set(self.unkeyed)
+        found.update(self.by_institute.get(item['full_name'], ()))
+        found.update(self.by_city.get(item['city_name'], ()))
+        if self.by_gram:
+            for n in range(1, GRAM + 1):
+                for i in range(len(text) - n + 1):
+                    found.update(self.by_gram.get(text[i:i + n], ()))
+        return found
+
+    def matches(self, item, deadline_day, today_day):
+        # Same rules as /search: exact city/institute, case-insensitive substring on title or skills
+        title, skills = item['title'].lower(), item['skills'].lower()
+        for search_id in self.candidates(item, f"{title}\n{skills}"):
+            s = self.searches[search_id]
+            if s['city'] and s['city'] != item['city_name']: continue
+            if s['institute'] and s['institute'] != item['full_name']: continue
+            if s['skills'] and s['skills'] not in title and s['skills'] not in skills: continue
+            if s['deadline_days'] is not None and not (0 <= deadline_day - today_day <= s['deadline_days']): continue
+            yield s
+
+# --- EVALUATION ---
+def evaluate_alerts(db_path=DB_PATH, alerts_db=ALERTS_DB):
+    """Tests postings logged since the watermark against every saved search and
+    appends the hits to alert_digest. Returns (postings checked, new alerts)."""
+    init_alerts(alerts_db, db_path)
+    conn = sqlite3.connect(alerts_db)
+    watermark = conn.execute("SELECT value FROM alert_state WHERE name = 'watermark'").fetchone()[0]
+    searches = [dict(zip(('id', 'user', 'city', 'institute', 'skills', 'deadline_days'), r))
+                for r in conn.execute("SELECT id, user, city, institute, skills, deadline_days FROM saved_searches")]
+    conn.close()
+
+    # Entries up to the watermark were handled last run; pruning them now (before the
+    # snapshot is loaded below) keeps the log small without forcing a second rebuild
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM posting_changes WHERE seq <= ?", (watermark,))
+    conn.commit()
+    head = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM posting_changes").fetchone()[0]
+    changed = [r[0] for r in conn.execute("SELECT DISTINCT posting_id FROM posting_changes WHERE seq > ? AND seq <= ?", (watermark, head))]
+    conn.close()
+    if head <= watermark: return 0, 0
+
+    new_alerts = []
+    if searches:
+        index = SearchIndex(searches)
+        store = get_store(db_path)
+        today_day = (date.today() - EPOCH).days
+        matched_on = datetime.now().strftime('%Y-%m-%d')
+        for posting_id in changed:
+            pos = store.position(posting_id) if store else None
+            if pos is None: continue   # expired or removed since it was logged
+            item = store.row(pos)
+            for s in index.matches(item, int(store.deadline_day[pos]), today_day):
+                new_alerts.append((s['user'], s['id'], posting_id, item['title'], item['full_name'],
+                                   item['link'], item['deadline'], matched_on))
+
+    conn = sqlite3.connect(alerts_db)
+    cur = conn.cursor()
+    cur.executemany("""
+        INSERT OR IGNORE INTO alert_digest (user, search_id, posting_id, title, institute, link, deadline, matched_on)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, new_alerts)
+    added = cur.rowcount if new_alerts else 0
+    cur.execute("UPDATE alert_state SET value = ? WHERE name = 'watermark'", (head,))
+    conn.commit()
+    conn.close()
+    return len(changed), added
+
+if __name__ == "__main__":
+    checked, added = evaluate_alerts()
+    print(f"🔔 Checked {checked} new/changed postings, {added} alerts added to digests")
@@ -1,16 +1,21 @@
 import os
 import sqlite3
 import re
-import pdfplumber
-import pandas as pd
 import json
 import random
+import zipfile
 from flask import Flask, render_template, request, jsonify
-from collections import Counter
-from datetime import datetime
 from dateutil import parser
+from institutes import INST_MAP
+from batch_match import extract_resume_text, PostingsIndex, BatchTooLarge, run_batch
+from postings_store import get_store
+from similar_index import get_similar_index
+from suggest_index import get_suggest_index
+from alerts import save_search, list_searches, delete_search, get_digest
+from history import get_series, history_path, GRAINS, DIMENSIONS
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = 50 * 2**20   # resume uploads, batch zips included
 
 # --- SYNCHRONIZED CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,66 +25,6 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 if not os.path.exists(UPLOAD_FOLDER): 
     os.makedirs(UPLOAD_FOLDER)
 
-# EXPANDED INSTITUTE MAP: 25+ Cities & Multiple Universities per City
-INST_MAP = {
-    # --- CHENNAI ---
-    "IITM": {"full": "IIT Madras", "city": "Chennai", "email": "recruit@iitm.ac.in"},
-    "AU": {"full": "Anna University", "city": "Chennai", "email": "cuic@annauniv.edu"},
-    "SRM": {"full": "SRM University", "city": "Chennai", "email": "placement@srmist.edu.in"},
-    "UNOM": {"full": "Madras University", "city": "Chennai", "email": "registrar@unom.ac.in"},
-    
-    # --- DELHI / NCR ---
-    "IITD": {"full": "IIT Delhi", "city": "Delhi", "email": "rectt@admin.iitd.ac.in"},
-    "IIITD": {"full": "IIIT Delhi", "city": "Delhi", "email": "admin@iiitd.ac.in"},
-    "DU": {"full": "Delhi University", "city": "Delhi", "email": "placement@du.ac.in"},
-    "AMITY": {"full": "Amity University", "city": "Noida", "email": "careers@amity.edu"},
-    
-    # --- MUMBAI ---
-    "IITB": {"full": "IIT Bombay", "city": "Mumbai", "email": "p_office@iitb.ac.in"},
-    "MU": {"full": "Mumbai University", "city": "Mumbai", "email": "registrar@fort.mu.ac.in"},
-    "ICT": {"full": "ICT Mumbai", "city": "Mumbai", "email": "registrar@ictmumbai.edu.in"},
-    
-    # --- BANGALORE ---
-    "IISc": {"full": "IISc Bangalore", "city": "Bangalore", "email": "registrar@iisc.ac.in"},
-    "IIITB": {"full": "IIIT Bangalore", "city": "Bangalore", "email": "info@iiitb.ac.in"},
-    "BU": {"full": "Bangalore University", "city": "Bangalore", "email": "reg@bub.ernet.in"},
-    
-    # --- PUNE ---
-    "IIITP": {"full": "IIIT Pune", "city": "Pune", "email": "careers@iiitp.ac.in"},
-    "SPPU": {"full": "Pune University", "city": "Pune", "email": "internship@unipune.ac.in"},
-    
-    # --- HYDERABAD ---
-    "IITH": {"full": "IIT Hyderabad", "city": "Hyderabad", "email": "office.rec@iith.ac.in"},
-    "IIIT": {"full": "IIIT Hyderabad", "city": "Hyderabad", "email": "query@iiit.ac.in"},
-    "OU": {"full": "Osmania University", "city": "Hyderabad", "email": "registrar@osmania.ac.in"},
-    
-    # --- TRICHY / MADURAI / COIMBATORE ---
-    "NITT": {"full": "NIT Trichy", "city": "Trichy", "email": "registrar@nitt.edu"},
-    "BDU": {"full": "Bharathidasan Uni", "city": "Trichy", "email": "reg@bdu.ac.in"},
-    "MKU": {"full": "Madurai Kamaraj Uni", "city": "Madurai", "email": "registrar@mkuniversity.org"},
-    "BHU_C": {"full": "Bharathiar Uni", "city": "Coimbatore", "email": "reg@buc.edu.in"},
-    "VIT": {"full": "VIT Vellore", "city": "Vellore", "email": "placement@vit.ac.in"},
-
-    # --- EAST & NORTH-EAST ---
-    "IITG": {"full": "IIT Guwahati", "city": "Guwahati", "email": "rec@iitg.ac.in"},
-    "IITBBS": {"full": "IIT Bhubaneswar", "city": "Bhubaneswar", "email": "recruitment@iitbbs.ac.in"},
-    "CU": {"full": "Calcutta University", "city": "Kolkata", "email": "admin@caluniv.ac.in"},
-    "JU": {"full": "Jadavpur University", "city": "Kolkata", "email": "registrar@jadavpuruniversity.in"},
-    "NITM": {"full": "NIT Meghalaya", "city": "Shillong", "email": "registrar@nitm.ac.in"},
-
-    # --- NORTH & WEST ---
-    "IITK": {"full": "IIT Kanpur", "city": "Kanpur", "email": "doad@iitk.ac.in"},
-    "IITR": {"full": "IIT Roorkee", "city": "Roorkee", "email": "recruit@iitr.ac.in"},
-    "IITJ": {"full": "IIT Jodhpur", "city": "Jodhpur", "email": "recruitment@iitj.ac.in"},
-    "IITGN": {"full": "IIT Gandhinagar", "city": "Gandhinagar", "email": "staff.recruitment@iitgn.ac.in"},
-    "GU": {"full": "Gujarat University", "city": "Ahmedabad", "email": "registrar@gujaratuniversity.ac.in"},
-    "PU": {"full": "Panjab University", "city": "Chandigarh", "email": "regstr@pu.ac.in"},
-    "IITDH": {"full": "IIT Dharwad", "city": "Dharwad", "email": "recruit@iitdh.ac.in"},
-    "NITC": {"full": "NIT Calicut", "city": "Calicut", "email": "recruit@nitc.ac.in"}
-}
-
-ADHOC_KEYS = ['jrf', 'srf', 'ra', 'project assistant', 'technical assistant', 'scientist', 'pa', 'adhoc', 'fellow']
-
 # --- DATABASE LOGIC ---
 def init_db():
     conn = sqlite3.connect(DB_NAME)
@@ -100,65 +45,33 @@ def init_db():
     conn.close()
 
 # --- DATA RETRIEVAL & ENRICHMENT ---
-def get_data():
-    if not os.path.exists(DB_NAME): return pd.DataFrame()
-    conn = sqlite3.connect(DB_NAME)
-    today_str = datetime.now().strftime('%Y-%m-%d')
-    today_ts = pd.Timestamp.now().normalize()
-    
-    cursor = conn.cursor()
-    # Clean up expired posts
-    cursor.execute("DELETE FROM postings WHERE deadline IS NOT NULL AND deadline != 'N/A' AND deadline < ?", (today_str,))
-    conn.commit()
-    
-    df = pd.read_sql_query("SELECT * FROM postings", conn)
-    conn.close()
-    
-    if df.empty: return pd.DataFrame()
-
-    def enrich(row):
-        code = str(row['institute_code']).strip().upper()
-        inst_info = INST_MAP.get(code, {"full": code, "city": "Other", "email": "contact@institute.ac.in"})
-        opp_type = "Ad-hoc Project" if any(k in str(row['title']).lower() for k in ADHOC_KEYS) else "Research Internship"
-        email = row['email'] if ('email' in row and row['email']) else inst_info['email']
-        
-        deadline_raw = str(row['deadline']).strip()
-        if not deadline_raw or deadline_raw.lower() in ['none', 'nan', 'n/a', '']:
-            return pd.Series([inst_info['full'], inst_info['city'], opp_type, "N/A", email])
-        
-        try:
-            deadline_dt = pd.to_datetime(deadline_raw)
-            diff = (deadline_dt - today_ts).days
-            status = "Closing Today" if diff == 0 else f"{int(diff)} days left"
-        except:
-            status = "Check PDF"
-            
-        return pd.Series([inst_info['full'], inst_info['city'], opp_type, status, email])
+# Postings are served from the shared columnar snapshot in postings_store.py
+_INDEX_CACHE = {}
 
-    df[['full_name', 'city_name', 'opp_type', 'days_left', 'email']] = df.apply(enrich, axis=1)
-    return df.fillna("N/A")
+def get_postings_index(store):
+    # The keyword index only changes with the snapshot, so build it once per data version
+    if _INDEX_CACHE.get('version') != store.version:
+        _INDEX_CACHE.update(version=store.version, index=PostingsIndex(store.records))
+    return _INDEX_CACHE['index']
 
 # --- ROUTES ---
 @app.route('/')
 def dashboard():
-    df = get_data()
-    if df.empty:
+    store = get_store(DB_NAME)
+    if not store:
         stats = {"total": 0, "inst_count": 0, "city_count": 0, "trends": []}
         urgent, leaderboard, city_stats = [], [], []
     else:
         stats = {
-            "total": len(df),
-            "inst_count": df['full_name'].nunique(),
-            "city_count": df['city_name'].nunique(),
-            "trends": Counter(" ".join(df['title'].astype(str)).lower().split()).most_common(5)
+            "total": len(store),
+            "inst_count": store.nunique('full_name'),
+            "city_count": store.nunique('city_name'),
+            "trends": store.trends
         }
         
-        urgent_df = df[~df['days_left'].isin(['Expired', 'N/A', 'Check PDF'])].copy()
-        urgent_df['sort_val'] = pd.to_datetime(urgent_df['deadline'], errors='coerce')
-        urgent = urgent_df.sort_values('sort_val').head(4).to_dict('records')
-        
-        leaderboard = df['full_name'].value_counts().head(5).to_dict()
-        city_stats = df['city_name'].value_counts().to_dict()
+        urgent = store.rows(store.by_deadline(4))
+        leaderboard = store.value_counts('full_name', 5)
+        city_stats = store.value_counts('city_name')
 
     return render_template('dashboard.html', stats=stats, urgent=urgent, leaderboard=leaderboard, city_stats=city_stats)
 
@@ -168,27 +81,80 @@ def search():
     s_inst = request.args.get('institute', '').strip()
     s_skills = request.args.get('skills', '').strip()
     
-    df = get_data()
+    store = get_store(DB_NAME)
     # Dynamically pull unique cities and institutes for the filters
-    cities = sorted(list(set(df['city_name'].tolist() if not df.empty else [v["city"] for v in INST_MAP.values()])))
-    institutes = sorted(list(set(df['full_name'].tolist() if not df.empty else [v["full"] for v in INST_MAP.values()])))
+    cities = sorted(store.categories['city_name'] if store else set(v["city"] for v in INST_MAP.values()))
+    institutes = sorted(store.categories['full_name'] if store else set(v["full"] for v in INST_MAP.values()))
     
     show_results = False
     results = []
 
-    if not df.empty:
+    if store:
         if s_city or s_inst or s_skills:
             show_results = True
-            filtered_df = df.copy()
-            if s_city: filtered_df = filtered_df[filtered_df['city_name'] == s_city]
-            if s_inst: filtered_df = filtered_df[filtered_df['full_name'] == s_inst]
-            if s_skills:
-                filtered_df = filtered_df[filtered_df['title'].str.contains(s_skills, case=False) | 
-                                          filtered_df['skills'].str.contains(s_skills, case=False)]
-            results = filtered_df.to_dict(orient='records')
+            results = store.rows(store.select(city=s_city, institute=s_inst, text=s_skills))
             
     return render_template('search.html', internships=results, cities=cities, institutes=institutes, show_results=show_results)
 
+@app.route('/api/suggest')
+def suggest():
+    q = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 8, type=int), 50))
+    index = get_suggest_index(get_store(DB_NAME))
+    return jsonify({"query": q, "suggestions": index.suggest(q, limit)})
+
+@app.route('/api/saved-searches', methods=['GET', 'POST'])
+def saved_searches():
+    # Saved /search filters; new postings are matched against them after every ingest (see alerts.py)
+    if request.method == 'GET':
+        user = request.args.get('user', '').strip()
+        if not user: return jsonify({"error": "user is required"}), 400
+        return jsonify({"searches": list_searches(user)})
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict): return jsonify({"error": "Expected a JSON object"}), 400
+    user = str(data.get('user', '')).strip()
+    if not user: return jsonify({"error": "user is required"}), 400
+    filters = {key: data.get(key) or '' for key in ('city', 'institute', 'skills')}
+    if not all(isinstance(v, str) for v in filters.values()):
+        return jsonify({"error": "city, institute and skills must be strings"}), 400
+    deadline_days = data.get('deadline_days')
+    if deadline_days in (None, ''):
+        deadline_days = None
+    elif isinstance(deadline_days, bool) or not str(deadline_days).strip().isdigit():
+        return jsonify({"error": "deadline_days must be a non-negative whole number"}), 400
+    search_id = save_search(user, filters['city'], filters['institute'], filters['skills'],
+                            int(deadline_days) if deadline_days is not None else None)
+    return jsonify({"id": search_id}), 201
+
+@app.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def remove_saved_search(search_id):
+    user = request.args.get('user', '').strip()
+    if not delete_search(search_id, user): return jsonify({"error": "Saved search not found"}), 404
+    return jsonify({"deleted": search_id})
+
+@app.route('/api/digest')
+def digest():
+    user = request.args.get('user', '').strip()
+    if not user: return jsonify({"error": "user is required"}), 400
+    alerts = get_digest(user, unseen_only=not request.args.get('all', 0, type=int),
+                        mark_seen=bool(request.args.get('mark_seen', 0, type=int)))
+    return jsonify({"user": user, "alerts": alerts})
+
+@app.route('/api/trends')
+def trends():
+    # Time series served straight from the daily/weekly rollups in history.db
+    grain = request.args.get('grain', 'week')
+    dimension = request.args.get('dimension', 'all')
+    value = request.args.get('value', 'all' if dimension == 'all' else '').strip()
+    if grain not in GRAINS or dimension not in DIMENSIONS or not value:
+        return jsonify({"error": f"grain must be one of {GRAINS}, dimension one of {DIMENSIONS}, and value is required"}), 400
+
+    since, until = request.args.get('since'), request.args.get('until')
+    series = get_series(grain, dimension, value, since, until, history_path(DB_NAME))
+    return jsonify({"grain": grain, "dimension": dimension, "value": value,
+                    "series": [{"bucket": b, "count": c} for b, c in series]})
+
 @app.route('/matcher')
 def matcher():
     return render_template('matcher.html')
@@ -200,23 +166,52 @@ def match_resume():
     path = os.path.join(UPLOAD_FOLDER, file.filename)
     file.save(path)
     
-    text = ""
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages: text += (page.extract_text() or "") + " "
-    
-    resume_text = text.lower()
-    df = get_data()
-    matches = []
-    
-    if not df.empty:
-        for item in df.to_dict(orient='records'):
-            content = str(item['title'] + " " + item['skills']).lower().replace(',',' ')
-            score = sum(1 for kw in set(content.split()) if len(kw) > 2 and kw in resume_text)
-            if score > 0:
-                item['match_score'] = score
-                matches.append(item)
+    resume_text = extract_resume_text(path)
+    store = get_store(DB_NAME)
+    matches = get_postings_index(store).score(resume_text) if store else []
             
-    return jsonify({"matches": sorted(matches, key=lambda x: x['match_score'], reverse=True)[:10]})
+    return jsonify({"matches": matches})
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({"error": f"Uploads are limited to {app.config['MAX_CONTENT_LENGTH'] // 2**20} MB"}), 413
+
+@app.route('/batch-match', methods=['POST'])
+def batch_match():
+    # Accepts a .zip of PDF resumes; extraction is spread across cores, postings are indexed once
+    if 'resumes' not in request.files: return jsonify({"results": [], "stats": {}})
+    file = request.files['resumes']
+    if not file.filename.lower().endswith('.zip'):
+        return jsonify({"error": "Upload a .zip of PDF resumes"}), 400
+
+    store = get_store(DB_NAME)
+    index = get_postings_index(store) if store else PostingsIndex([])
+    top_n = request.form.get('top', 10, type=int)
+    try:
+        results, stats = run_batch(file.stream, top_n=top_n, index=index)
+    except zipfile.BadZipFile:
+        return jsonify({"error": "The upload is not a valid .zip file"}), 400
+    except BatchTooLarge as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"results": results, "stats": stats})
+
+@app.route('/similar/<int:posting_id>')
+def similar(posting_id):
+    # Nearest postings by precomputed TF-IDF vectors; other institutes only unless same_institute=1
+    store = get_store(DB_NAME)
+    pos = store.position(posting_id) if store else None
+    if pos is None: return jsonify({"error": "Posting not found"}), 404
+
+    k = max(1, min(request.args.get('k', 5, type=int), 50))
+    skip = None if request.args.get('same_institute', 0, type=int) else store.codes['full_name'] == store.codes['full_name'][pos]
+    hits = get_similar_index(store).similar_to(pos, k, skip)
+
+    matches = []
+    for hit_pos, score in hits:
+        item = store.row(hit_pos)
+        item['similarity'] = round(score, 3)
+        matches.append(item)
+    return jsonify({"posting": store.row(pos), "similar": matches})
 
 @app.route('/roadmap')
 def roadmap():
@@ -274,6 +269,34 @@ def roadmap():
     return render_template('roadmap.html', skills=skill_roadmap)
 
 # --- CHATBOT LOGIC (CLEAN FIXED VERSION) ---
+SIMILAR_INTENT = re.compile(r"^(?:similar|related)\b(?:\s+to\b)?\s*(.*)$")
+
+def similar_reply(query):
+    # "similar to 42" -> neighbours of posting 42 at other institutes; "similar nlp" -> free-text lookup
+    store = get_store(DB_NAME)
+    if not store: return "No active listings yet."
+    if not query:
+        return "Tell me a posting id or a topic, e.g. <b>similar to 42</b> or <b>similar machine learning</b>."
+
+    index = get_similar_index(store)
+    if query.isdigit():
+        pos = store.position(int(query))
+        if pos is None: return f"No active posting with id <b>{query}</b>."
+        hits = index.similar_to(pos, skip=store.codes['full_name'] == store.codes['full_name'][pos])
+        response_text = f"<b>Similar to '{store.strings['title'][pos]}'</b><br><br>"
+    else:
+        hits = index.query_text(query)
+        response_text = f"<b>Postings similar to '{query}'</b><br><br>"
+
+    if not hits: return f"No similar listings found for <b>{query}</b>."
+    for hit_pos, _ in hits:
+        item = store.row(hit_pos)
+        response_text += f"""
+        • <a href="{item['link']}" target="_blank" style="color:#0d6efd;">
+        {item['title']}</a> <small>({item['full_name']})</small><br>
+        """
+    return response_text
+
 # --- CLEAN CHATBOT LOGIC ---
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -284,6 +307,10 @@ def chat():
         if not user_msg:
             return jsonify({"response": "Please type something."})
 
+        similar_match = SIMILAR_INTENT.match(user_msg)
+        if similar_match:
+            return jsonify({"response": similar_reply(similar_match.group(1).strip())})
+
         conn = sqlite3.connect(DB_NAME)
         cur = conn.cursor()
 
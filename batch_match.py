@@ -0,0 +1,166 @@
+import os
+import io
+import csv
+import json
+import re
+import time
+import zipfile
+import argparse
+import pdfplumber
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from postings_store import get_store
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+OUTPUT_FOLDER = os.path.join(BASE_DIR, 'batch_results')
+TOP_N = 10
+MAX_RESUMES = 500                  # PDFs per zip
+MAX_RESUME_BYTES = 20 * 2**20      # uncompressed, per PDF
+MAX_BATCH_BYTES = 200 * 2**20      # uncompressed, whole zip
+EXPORT_FIELDS = ['match_score', 'full_name', 'city_name', 'opp_type', 'title', 'days_left', 'deadline', 'link', 'email']
+
+class BatchTooLarge(ValueError):
+    """Raised when a zip holds more, or larger, resumes than one batch accepts."""
+
+# --- PDF EXTRACTION (runs inside worker processes) ---
+def extract_resume_text(source):
+    """Returns the lower-cased text of one PDF. `source` is a path or raw bytes."""
+    text = ""
+    fp = io.BytesIO(source) if isinstance(source, bytes) else source
+    with pdfplumber.open(fp) as pdf:
+        for page in pdf.pages: text += (page.extract_text() or "") + " "
+    return text.lower()
+
+def _extract_job(job):
+    # Top-level so ProcessPoolExecutor can pickle it
+    name, source = job
+    try:
+        return name, extract_resume_text(source), None
+    except Exception as e:
+        return name, "", str(e)
+
+# --- POSTINGS INDEX (built once per batch) ---
+class PostingsIndex:
+    """Keyword -> posting positions, so a resume is scored with one pass over the
+    vocabulary instead of re-tokenising every posting for every resume."""
+
+    def __init__(self, records):
+        self.records = records
+        self.postings_by_kw = defaultdict(list)
+        for pos, item in enumerate(records):
+            content = str(item['title'] + " " + item['skills']).lower().replace(',', ' ')
+            for kw in set(content.split()):
+                if len(kw) > 2: self.postings_by_kw[kw].append(pos)
+
+    def __len__(self):
+        return len(self.records)
+
+    def score(self, resume_text, top_n=TOP_N):
+        # Same rule as /match-resume: one point per posting keyword found anywhere in the resume
+        scores = defaultdict(int)
+        for kw, positions in self.postings_by_kw.items():
+            if kw in resume_text:
+                for pos in positions: scores[pos] += 1
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        if top_n: ranked = ranked[:top_n]
+
+        matches = []
+        for pos, score in ranked:
+            item = dict(self.records[pos])
+            item['match_score'] = score
+            matches.append(item)
+        return matches
+
+# --- INPUT COLLECTION ---
+def collect_resumes(source):
+    """Yields (name, path-or-bytes) for every PDF in a directory, a zip file or a zip file object."""
+    if isinstance(source, str) and os.path.isdir(source):
+        for fname in sorted(os.listdir(source)):
+            if fname.lower().endswith('.pdf'):
+                yield fname, os.path.join(source, fname)
+        return
+
+    with zipfile.ZipFile(source) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir() and info.filename.lower().endswith('.pdf')]
+        if len(members) > MAX_RESUMES:
+            raise BatchTooLarge(f"{len(members)} resumes in one zip; the limit is {MAX_RESUMES}")
+        if sum(info.file_size for info in members) > MAX_BATCH_BYTES:
+            raise BatchTooLarge(f"resumes exceed {MAX_BATCH_BYTES // 2**20} MB uncompressed")
+        for info in members:
+            # file_size comes from the zip header, so the read itself is capped too
+            with zf.open(info) as f:
+                data = f.read(MAX_RESUME_BYTES + 1)
+            if len(data) > MAX_RESUME_BYTES:
+                raise BatchTooLarge(f"{info.filename} exceeds {MAX_RESUME_BYTES // 2**20} MB uncompressed")
+            # Keep the path inside the archive: the same file name often appears in several folders
+            yield info.filename, data
+
+def run_batch(source, records=None, workers=None, top_n=TOP_N, index=None):
+    """Extracts every resume in parallel and scores it against a single postings index:
+    `index` when given (e.g. one cached per snapshot version), else one built from `records`."""
+    start = time.perf_counter()
+    if index is None: index = PostingsIndex(records)
+    jobs = list(collect_resumes(source))
+
+    results = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, text, error in pool.map(_extract_job, jobs, chunksize=max(1, len(jobs) // 32)):
+                entry = {"resume": name, "matches": index.score(text, top_n) if text else []}
+                if error: entry["error"] = error
+                results.append(entry)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "resumes": len(results),
+        "postings": len(index),
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(len(results) / elapsed, 2) if elapsed > 0 else 0.0
+    }
+    return results, stats
+
+# --- OUTPUT ---
+def write_results(results, out_dir, fmt='csv'):
+    os.makedirs(out_dir, exist_ok=True)
+    used = set()
+    for entry in results:
+        # Flatten zip paths into one file name, numbering any that still collide
+        base = re.sub(r'[\\/]+', '__', os.path.splitext(entry['resume'])[0]) or 'resume'
+        stem, n = base, 1
+        while stem.lower() in used:
+            n += 1
+            stem = f"{base}_{n}"
+        used.add(stem.lower())
+        if fmt == 'json':
+            with open(os.path.join(out_dir, f"{stem}.json"), 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2, default=str)
+        else:
+            with open(os.path.join(out_dir, f"{stem}.csv"), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['rank'] + EXPORT_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                for rank, item in enumerate(entry['matches'], start=1):
+                    writer.writerow({"rank": rank, **item})
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Match a directory or zip of PDF resumes against all active postings.")
+    ap.add_argument("source", nargs="?", default=UPLOAD_FOLDER, help="Directory or .zip of resumes (default: uploads/)")
+    ap.add_argument("-o", "--out", default=OUTPUT_FOLDER, help="Where to write one ranked file per resume")
+    ap.add_argument("-f", "--format", choices=["csv", "json"], default="csv")
+    ap.add_argument("-w", "--workers", type=int, default=None, help="Extraction processes (default: all cores)")
+    ap.add_argument("-n", "--top", type=int, default=TOP_N, help="Matches kept per resume (0 = all)")
+    args = ap.parse_args()
+
+    store = get_store()
+    records = store.records if store else []
+
+    print(f"📂 Matching resumes from {args.source} against {len(records)} postings...")
+    results, stats = run_batch(args.source, records, workers=args.workers, top_n=args.top)
+    write_results(results, args.out, args.format)
+
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"\n✅ BATCH COMPLETE")
+    print(f"📊 {stats['resumes']} resumes in {stats['seconds']}s ({stats['resumes_per_sec']} resumes/sec), {failed} failed")
+    print(f"📁 Results written to {args.out}")
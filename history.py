@@ -0,0 +1,171 @@
+import os
+import sqlite3
+from collections import Counter
+from datetime import date, datetime, timedelta
+from institutes import lookup_institute, opportunity_type
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "projects.db")
+GRAINS = ('day', 'week')
+DIMENSIONS = ('all', 'institute', 'city', 'type', 'skill')
+POSTING_COLS = "rowid, institute_code, title, skills, deadline, link, email, posted_on"
+
+def posting_columns(conn):
+    """POSTING_COLS as a select list for the postings table behind `conn`. Older tables
+    (e.g. the one migrate.py writes) lack email or posted_on; those read as NULL."""
+    have = {row[1] for row in conn.execute("PRAGMA table_info(postings)")}
+    return ", ".join(col if col == 'rowid' or col in have else f"NULL AS {col}" for col in POSTING_COLS.split(", "))
+
+def history_path(db_path=DB_PATH):
+    # history.db lives next to the postings DB it archives
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "history.db")
+
+# --- DATABASE LOGIC ---
+def init_history(history_db):
+    conn = sqlite3.connect(history_db)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS archived_postings (
+            link TEXT,
+            title TEXT,
+            partition TEXT,
+            posting_id INTEGER,
+            PRIMARY KEY (link, title)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rollups (
+            grain TEXT,
+            dimension TEXT,
+            value TEXT,
+            bucket TEXT,
+            count INTEGER,
+            PRIMARY KEY (grain, dimension, value, bucket)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS history_state (
+            name TEXT PRIMARY KEY,
+            value INTEGER
+        );
+    """)
+    # Archives written before posting_id was tracked
+    if 'posting_id' not in {row[1] for row in conn.execute("PRAGMA table_info(archived_postings)")}:
+        conn.execute("ALTER TABLE archived_postings ADD COLUMN posting_id INTEGER")
+    conn.commit()
+    conn.close()
+
+def _partition(cur, day):
+    # Append-only table per posting month, e.g. postings_2026_10
+    name = f"postings_{day.year:04d}_{day.month:02d}"
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            posting_id INTEGER,
+            institute_code TEXT,
+            full_name TEXT,
+            city_name TEXT,
+            opp_type TEXT,
+            title TEXT,
+            skills TEXT,
+            deadline TEXT,
+            link TEXT,
+            email TEXT,
+            posted_on DATE,
+            archived_on DATE
+        )
+    """)
+    return name
+
+def _posted_day(posted_on, fallback):
+    try:
+        return datetime.strptime(str(posted_on).strip()[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return fallback
+
+def skill_terms(skills):
+    return {s.strip().lower() for s in str(skills or "").split(',') if 2 <= len(s.strip()) <= 40}
+
+# --- ARCHIVING ---
+def archive_postings(rows, history_db):
+    """Appends postings (rows of POSTING_COLS) not archived before and bumps their
+    daily and weekly rollups. Returns how many were new to the archive."""
+    init_history(history_db)
+    conn = sqlite3.connect(history_db)
+    cur = conn.cursor()
+    today = date.today()
+    archived_on = today.strftime('%Y-%m-%d')
+    increments, partitions = Counter(), {}
+    added = 0
+
+    for posting_id, code, title, skills, deadline, link, email, posted_on in rows:
+        day = _posted_day(posted_on, today)
+        month = (day.year, day.month)
+        if month not in partitions: partitions[month] = _partition(cur, day)
+        partition = partitions[month]
+        # Loaders re-append the same CSV rows, so a posting is identified by link + title
+        cur.execute("INSERT OR IGNORE INTO archived_postings (link, title, partition, posting_id) VALUES (?, ?, ?, ?)",
+                    (link, title, partition, posting_id))
+        if cur.rowcount == 0: continue
+        # A posting retitled in place since it was archived keeps its rowid: it is archived
+        # again but already counted. Other new titles under a known link are distinct positions.
+        retitled = cur.execute("SELECT 1 FROM archived_postings WHERE link = ? AND posting_id = ? AND title != ? LIMIT 1",
+                               (link, posting_id, title)).fetchone()
+
+        inst_info = lookup_institute(code)
+        opp_type = opportunity_type(title)
+        cur.execute(f"INSERT INTO {partition} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (posting_id, code, inst_info['full'], inst_info['city'], opp_type, title, skills,
+                     deadline, link, email, day.strftime('%Y-%m-%d'), archived_on))
+        added += 1
+        if retitled: continue
+
+        buckets = {'day': day.strftime('%Y-%m-%d'), 'week': (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')}
+        values = [('all', 'all'), ('institute', inst_info['full']), ('city', inst_info['city']), ('type', opp_type)]
+        values += [('skill', term) for term in skill_terms(skills)]
+        for grain, bucket in buckets.items():
+            for dimension, value in values:
+                increments[(grain, dimension, value, bucket)] += 1
+
+    cur.executemany("""
+        INSERT INTO rollups (grain, dimension, value, bucket, count) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (grain, dimension, value, bucket) DO UPDATE SET count = count + excluded.count
+    """, [(*key, n) for key, n in increments.items()])
+    conn.commit()
+    conn.close()
+    return added
+
+def record_new_postings(db_path=DB_PATH, history_db=None):
+    """Archives postings inserted since the last call, using a rowid watermark."""
+    history_db = history_db or history_path(db_path)
+    init_history(history_db)
+    conn = sqlite3.connect(history_db)
+    row = conn.execute("SELECT value FROM history_state WHERE name = 'last_rowid'").fetchone()
+    conn.close()
+    watermark = row[0] if row else 0
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT {posting_columns(conn)} FROM postings WHERE rowid > ? ORDER BY rowid", (watermark,)).fetchall()
+    conn.close()
+    if not rows: return 0
+
+    added = archive_postings(rows, history_db)
+    conn = sqlite3.connect(history_db)
+    conn.execute("INSERT OR REPLACE INTO history_state (name, value) VALUES ('last_rowid', ?)", (rows[-1][0],))
+    conn.commit()
+    conn.close()
+    return added
+
+# --- QUERIES ---
+def get_series(grain='week', dimension='all', value='all', since=None, until=None, history_db=None):
+    """[(bucket, count), ...] for one rollup series: an index range read, independent of archive size."""
+    history_db = history_db or history_path()
+    if not os.path.exists(history_db): return []
+    if dimension == 'skill': value = value.lower()
+    conn = sqlite3.connect(history_db)
+    rows = conn.execute("""
+        SELECT bucket, count FROM rollups
+        WHERE grain = ? AND dimension = ? AND value = ? AND bucket >= ? AND bucket <= ?
+        ORDER BY bucket
+    """, (grain, dimension, value, since or '0000-00-00', until or '9999-99-99')).fetchall()
+    conn.close()
+    return rows
+
+if __name__ == "__main__":
+    added = record_new_postings()
+    print(f"🗄️ Archived {added} new postings to {history_path()}")
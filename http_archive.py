@@ -0,0 +1,84 @@
+import json
+import time
+import zipfile
+import requests
+from requests.structures import CaseInsensitiveDict
+from datetime import datetime
+from http_fetch import FetchRejected
+
+# One LZMA-compressed zip per scrape run:
+#   index.json        -> [{url, final_url, status, headers, encoding, fetched_at, elapsed, body}, ...]
+#                        (failed fetches keep {url, fetched_at, elapsed, error} instead)
+#   bodies/<n>.bin    -> raw response bytes
+
+class ArchivedResponse:
+    """The subset of requests.Response the scraper uses, rebuilt from an archive entry."""
+
+    def __init__(self, entry, content):
+        self.url = entry['final_url']
+        self.status_code = entry['status']
+        self.headers = CaseInsensitiveDict(entry['headers'])
+        self.content = content
+        self.encoding = entry.get('encoding') or 'utf-8'
+        self.fetched_at = entry['fetched_at']
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+class ArchiveWriter:
+    """Wraps a fetch function and stores every response (or failure) it produces."""
+
+    def __init__(self, path):
+        self.path = path
+        self.zf = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_LZMA)
+        self.entries = []
+
+    def wrap(self, fetch):
+        def recording_fetch(url, **kwargs):
+            entry = {"url": url, "fetched_at": datetime.now().isoformat(timespec='seconds')}
+            start = time.perf_counter()
+            try:
+                response = fetch(url, **kwargs)
+            except Exception as e:
+                entry.update(error=f"{type(e).__name__}: {e}", elapsed=round(time.perf_counter() - start, 3))
+                self.entries.append(entry)
+                raise
+            body = f"bodies/{len(self.entries)}.bin"
+            self.zf.writestr(body, response.content)
+            entry.update(final_url=response.url, status=response.status_code, headers=dict(response.headers),
+                         encoding=response.encoding or response.apparent_encoding, body=body, elapsed=round(time.perf_counter() - start, 3))
+            self.entries.append(entry)
+            return response
+        return recording_fetch
+
+    def close(self):
+        self.zf.writestr('index.json', json.dumps(self.entries, indent=1))
+        self.zf.close()
+
+class ArchiveReader:
+    """Serves archived responses by URL, with no network access and no delays."""
+
+    def __init__(self, path):
+        self.zf = zipfile.ZipFile(path)
+        self.entries = {e['url']: e for e in json.loads(self.zf.read('index.json'))}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fetch(self, url, **kwargs):
+        entry = self.entries.get(url)
+        if entry is None:
+            raise requests.ConnectionError(f"{url} is not in the archive")
+        if 'error' in entry:
+            if entry['error'].startswith('FetchRejected'):
+                raise FetchRejected(entry['error'].split(': ', 1)[-1])
+            raise requests.ConnectionError(f"Recorded failure: {entry['error']}")
+        return ArchivedResponse(entry, self.zf.read(entry['body']))
+
+    def close(self):
+        self.zf.close()
@@ -0,0 +1,76 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+# CONFIGURATION
+USER_AGENT = "Mozilla/5.0"
+TIMEOUT = (10, 30)                 # connect, read
+MAX_HTML_BYTES = 5 * 2**20         # decoded body caps; larger responses are dropped unparsed
+MAX_PDF_BYTES = 20 * 2**20
+CHUNK = 64 * 1024
+HTML_TYPES = ('text/html', 'application/xhtml+xml', 'text/xml', 'application/xml', 'text/plain')
+PDF_TYPES = ('application/pdf', 'application/x-pdf')
+
+class FetchRejected(requests.RequestException):
+    """Raised for responses that are fetched fine but not worth parsing (too big, binary)."""
+
+def _new_session():
+    session = requests.Session()
+    # One keep-alive pool per host; the scraper visits ~80 hosts, a few of them several times
+    adapter = HTTPAdapter(pool_connections=100, pool_maxsize=4,
+                          max_retries=Retry(total=2, connect=2, read=1, backoff_factor=0.5,
+                                            status_forcelist=(502, 503, 504), allowed_methods=('GET',),
+                                            raise_on_status=False))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # urllib3's list only advertises br/zstd when a decoder for them is installed
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+    session.verify = False
+    return session
+
+SESSION = _new_session()
+
+def content_kind(response, head=None):
+    """'html', 'pdf' or 'binary' from the Content-Type header, falling back to the first body bytes."""
+    ctype = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if ctype in PDF_TYPES: return 'pdf'
+    if ctype in HTML_TYPES: return 'html'
+    head = (head if head is not None else response.content[:512]).lstrip()
+    if head.startswith(b'%PDF-'): return 'pdf'
+    if head[:1] == b'<' or not ctype: return 'html'
+    return 'binary'
+
+def fetch(url, session=None):
+    """GETs `url` over the shared pooled session, streaming the body so oversized or
+    binary responses are abandoned before they are downloaded in full.
+    The returned Response has `.content` filled and a `.kind` of 'html' or 'pdf'.
+    Error statuses are returned too, so an archive can record them; callers check
+    raise_for_status() themselves."""
+    response = (session or SESSION).get(url, timeout=TIMEOUT, stream=True)
+    try:
+        chunks = response.iter_content(CHUNK)
+        first = next(chunks, b"")
+        kind = content_kind(response, first)
+        if kind == 'binary':
+            raise FetchRejected(f"binary content ({response.headers.get('Content-Type')})")
+
+        cap = MAX_PDF_BYTES if kind == 'pdf' else MAX_HTML_BYTES
+        length = response.headers.get('Content-Length')
+        # Content-Length is the on-the-wire size; only trust it for uncompressed bodies
+        if length and length.isdigit() and not response.headers.get('Content-Encoding') and int(length) > cap:
+            raise FetchRejected(f"{int(length) // 1024} KB exceeds the {cap // 1024} KB cap")
+
+        body, size = [first], len(first)
+        for chunk in chunks:
+            size += len(chunk)
+            if size > cap:
+                raise FetchRejected(f"body exceeds the {cap // 1024} KB cap")
+            body.append(chunk)
+    finally:
+        response.close()
+
+    response._content = b"".join(body)
+    response._content_consumed = True
+    response.kind = kind
+    return response
@@ -0,0 +1,74 @@
+# =========================================================
+# INSTITUTES.PY - Institute directory shared by the app and the postings store
+# =========================================================
+
+# EXPANDED INSTITUTE MAP: 25+ Cities & Multiple Universities per City
+INST_MAP = {
+    # --- CHENNAI ---
+    "IITM": {"full": "IIT Madras", "city": "Chennai", "email": "recruit@iitm.ac.in"},
+    "AU": {"full": "Anna University", "city": "Chennai", "email": "cuic@annauniv.edu"},
+    "SRM": {"full": "SRM University", "city": "Chennai", "email": "placement@srmist.edu.in"},
+    "UNOM": {"full": "Madras University", "city": "Chennai", "email": "registrar@unom.ac.in"},
+    
+    # --- DELHI / NCR ---
+    "IITD": {"full": "IIT Delhi", "city": "Delhi", "email": "rectt@admin.iitd.ac.in"},
+    "IIITD": {"full": "IIIT Delhi", "city": "Delhi", "email": "admin@iiitd.ac.in"},
+    "DU": {"full": "Delhi University", "city": "Delhi", "email": "placement@du.ac.in"},
+    "AMITY": {"full": "Amity University", "city": "Noida", "email": "careers@amity.edu"},
+    
+    # --- MUMBAI ---
+    "IITB": {"full": "IIT Bombay", "city": "Mumbai", "email": "p_office@iitb.ac.in"},
+    "MU": {"full": "Mumbai University", "city": "Mumbai", "email": "registrar@fort.mu.ac.in"},
+    "ICT": {"full": "ICT Mumbai", "city": "Mumbai", "email": "registrar@ictmumbai.edu.in"},
+    
+    # --- BANGALORE ---
+    "IISc": {"full": "IISc Bangalore", "city": "Bangalore", "email": "registrar@iisc.ac.in"},
+    "IIITB": {"full": "IIIT Bangalore", "city": "Bangalore", "email": "info@iiitb.ac.in"},
+    "BU": {"full": "Bangalore University", "city": "Bangalore", "email": "reg@bub.ernet.in"},
+    
+    # --- PUNE ---
+    "IIITP": {"full": "IIIT Pune", "city": "Pune", "email": "careers@iiitp.ac.in"},
+    "SPPU": {"full": "Pune University", "city": "Pune", "email": "internship@unipune.ac.in"},
+    
+    # --- HYDERABAD ---
+    "IITH": {"full": "IIT Hyderabad", "city": "Hyderabad", "email": "office.rec@iith.ac.in"},
+    "IIIT": {"full": "IIIT Hyderabad", "city": "Hyderabad", "email": "query@iiit.ac.in"},
+    "OU": {"full": "Osmania University", "city": "Hyderabad", "email": "registrar@osmania.ac.in"},
+    
+    # --- TRICHY / MADURAI / COIMBATORE ---
+    "NITT": {"full": "NIT Trichy", "city": "Trichy", "email": "registrar@nitt.edu"},
+    "BDU": {"full": "Bharathidasan Uni", "city": "Trichy", "email": "reg@bdu.ac.in"},
+    "MKU": {"full": "Madurai Kamaraj Uni", "city": "Madurai", "email": "registrar@mkuniversity.org"},
+    "BHU_C": {"full": "Bharathiar Uni", "city": "Coimbatore", "email": "reg@buc.edu.in"},
+    "VIT": {"full": "VIT Vellore", "city": "Vellore", "email": "placement@vit.ac.in"},
+
+    # --- EAST & NORTH-EAST ---
+    "IITG": {"full": "IIT Guwahati", "city": "Guwahati", "email": "rec@iitg.ac.in"},
+    "IITBBS": {"full": "IIT Bhubaneswar", "city": "Bhubaneswar", "email": "recruitment@iitbbs.ac.in"},
+    "CU": {"full": "Calcutta University", "city": "Kolkata", "email": "admin@caluniv.ac.in"},
+    "JU": {"full": "Jadavpur University", "city": "Kolkata", "email": "registrar@jadavpuruniversity.in"},
+    "NITM": {"full": "NIT Meghalaya", "city": "Shillong", "email": "registrar@nitm.ac.in"},
+
+    # --- NORTH & WEST ---
+    "IITK": {"full": "IIT Kanpur", "city": "Kanpur", "email": "doad@iitk.ac.in"},
+    "IITR": {"full": "IIT Roorkee", "city": "Roorkee", "email": "recruit@iitr.ac.in"},
+    "IITJ": {"full": "IIT Jodhpur", "city": "Jodhpur", "email": "recruitment@iitj.ac.in"},
+    "IITGN": {"full": "IIT Gandhinagar", "city": "Gandhinagar", "email": "staff.recruitment@iitgn.ac.in"},
+    "GU": {"full": "Gujarat University", "city": "Ahmedabad", "email": "registrar@gujaratuniversity.ac.in"},
+    "PU": {"full": "Panjab University", "city": "Chandigarh", "email": "regstr@pu.ac.in"},
+    "IITDH": {"full": "IIT Dharwad", "city": "Dharwad", "email": "recruit@iitdh.ac.in"},
+    "NITC": {"full": "NIT Calicut", "city": "Calicut", "email": "recruit@nitc.ac.in"}
+}
+
+ADHOC_KEYS = ['jrf', 'srf', 'ra', 'project assistant', 'technical assistant', 'scientist', 'pa', 'adhoc', 'fellow']
+
+DEFAULT_EMAIL = "contact@institute.ac.in"
+_INST_LOOKUP = {k.upper(): v for k, v in INST_MAP.items()}
+
+def lookup_institute(institute_code):
+    """INST_MAP entry for a posting's institute code (case-insensitive); unknown codes get city 'Other'."""
+    code = str(institute_code).strip().upper()
+    return _INST_LOOKUP.get(code, {"full": code, "city": "Other", "email": DEFAULT_EMAIL})
+
+def opportunity_type(title):
+    return "Ad-hoc Project" if any(k in str(title).lower() for k in ADHOC_KEYS) else "Research Internship"
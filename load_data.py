@@ -1,6 +1,8 @@
 import sqlite3
 import pandas as pd
 import os
+from alerts import init_change_log, evaluate_alerts
+from history import record_new_postings
 
 # CONFIGURATION
 DB_NAME = 'projects.db'
@@ -11,6 +13,9 @@ def load_data():
         print(f"❌ Error: Could not find {CSV_FILE}")
         return
 
+    # Log the appended rows through the change-log triggers, like a scrape does
+    init_change_log(DB_NAME)
+
     # 1. Connect to Database
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
@@ -43,5 +48,9 @@ def load_data():
 
     conn.close()
 
+    print(f"🗄️ History: {record_new_postings(DB_NAME)} postings archived")
+    checked, alerted = evaluate_alerts(DB_NAME)
+    print(f"🔔 Saved searches: {checked} new/changed postings checked, {alerted} alerts queued")
+
 if __name__ == "__main__":
     load_data()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import sqlite3
 import pandas as pd
 import os
+from alerts import init_change_log, evaluate_alerts
+from history import record_new_postings
 from datetime import datetime
 
 # CONFIGURATION
@@ -44,6 +46,8 @@ def load_data():
     df_clean['posted_on'] = datetime.today().strftime('%Y-%m-%d')
 
     # 4. Connect and Save to Database
+    # Log the appended rows through the change-log triggers, like a scrape does
+    init_change_log(DB_NAME)
     conn = sqlite3.connect(DB_NAME)
     try:
         # 'append' ensures we ADD this data to your existing premium_institutes data
@@ -55,5 +59,9 @@ def load_data():
     
     conn.close()
 
+    print(f"🗄️ History: {record_new_postings(DB_NAME)} postings archived")
+    checked, alerted = evaluate_alerts(DB_NAME)
+    print(f"🔔 Saved searches: {checked} new/changed postings checked, {alerted} alerts queued")
+
 if __name__ == "__main__":
     load_data()
\ No newline at end of file
@@ -0,0 +1,351 @@
+import os
+import json
+import mmap
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from collections import Counter
+from datetime import datetime, date
+from institutes import lookup_institute, opportunity_type
+from history import record_new_postings, archive_postings, history_path, posting_columns
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, 'projects.db')
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshot')
+SNAPSHOT_GRACE = 600   # seconds a superseded snapshot is kept for workers that are still loading it
+
+STRING_COLS = ['institute_code', 'title', 'skills', 'deadline', 'link', 'email', 'posted_on']
+CATEGORY_COLS = ['full_name', 'city_name', 'opp_type']
+EPOCH = date(1970, 1, 1)
+
+# deadline_day holds days since 1970-01-01, or one of these markers
+NO_DEADLINE = -1        # blank / 'N/A' -> days_left "N/A"
+UNPARSED_DEADLINE = -2  # unparseable text -> days_left "Check PDF"
+
+# --- COLUMN TYPES ---
+class StringColumn:
+    """Variable-length strings stored as one UTF-8 blob plus an offsets array.
+    Both are memory-mapped, so every worker reading the same snapshot shares the pages."""
+    __slots__ = ('_blob', '_offsets')
+
+    def __init__(self, blob_path, offsets_path):
+        self._offsets = np.load(offsets_path, mmap_mode='r')
+        with open(blob_path, 'rb') as f:
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].decode('utf-8')
+
+    def find_rows(self, needle):
+        """Row indices whose value contains `needle` (bytes), found by scanning the blob once."""
+        rows = []
+        pos = self._blob.find(needle)
+        while pos != -1:
+            row = int(np.searchsorted(self._offsets, pos, side='right')) - 1
+            if row + 1 >= len(self._offsets): break   # a match at the very end of the blob belongs to no row
+            rows.append(row)
+            pos = self._blob.find(needle, int(self._offsets[row + 1]))
+        return np.asarray(rows, dtype=np.int64)
+
+    @staticmethod
+    def write(blob_path, offsets_path, values):
+        encoded = [v.encode('utf-8') for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        with open(blob_path, 'wb') as f:
+            f.write(b"".join(encoded))
+        np.save(offsets_path, offsets)
+
+class RecordView:
+    """Read-only sequence of row dicts, materialised one at a time on access."""
+    __slots__ = ('_store',)
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, i):
+        return self._store.row(i)
+
+    def __iter__(self):
+        return (self._store.row(i) for i in range(len(self._store)))
+
+# --- SNAPSHOT ---
+class PostingsStore:
+    """Columnar, memory-mapped view of all active postings.
+
+    Institute, city and opportunity type are small integer codes into shared
+    category tables; text columns are StringColumns. Filters and sorts return
+    index arrays, and dicts are only built for the rows that get rendered."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.path = path
+        self.version = meta['version']
+        self.trends = [tuple(t) for t in meta['trends']]
+        self.categories = meta['categories']
+        self._category_pos = {col: {v: i for i, v in enumerate(vals)} for col, vals in self.categories.items()}
+
+        self.ids = np.load(os.path.join(path, 'id.npy'), mmap_mode='r')
+        self.deadline_day = np.load(os.path.join(path, 'deadline_day.npy'), mmap_mode='r')
+        self.codes = {col: np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r') for col in CATEGORY_COLS}
+        self.strings = {col: StringColumn(os.path.join(path, f'{col}.bin'), os.path.join(path, f'{col}.off.npy'))
+                        for col in STRING_COLS + ['search']}
+        self.records = RecordView(self)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def days_left(self, i, today=None):
+        day = int(self.deadline_day[i])
+        if day == NO_DEADLINE: return "N/A"
+        if day == UNPARSED_DEADLINE: return "Check PDF"
+        diff = day - ((today or date.today()) - EPOCH).days
+        return "Closing Today" if diff == 0 else f"{diff} days left"
+
+    def row(self, i):
+        item = {"id": int(self.ids[i])}
+        for col in STRING_COLS: item[col] = self.strings[col][i]
+        for col in CATEGORY_COLS: item[col] = self.categories[col][self.codes[col][i]]
+        item['days_left'] = self.days_left(i)
+        return item
+
+    def position(self, posting_id):
+        """Row index of a posting id (ids are sorted), or None."""
+        pos = int(np.searchsorted(self.ids, posting_id))
+        return pos if pos < len(self) and self.ids[pos] == posting_id else None
+
+    def rows(self, idx):
+        return [self.row(i) for i in idx]
+
+    def nunique(self, col):
+        return len(self.categories[col])
+
+    def value_counts(self, col, n=None):
+        counts = np.bincount(self.codes[col], minlength=len(self.categories[col]))
+        order = np.argsort(-counts, kind='stable')[:n]
+        return {self.categories[col][k]: int(counts[k]) for k in order if counts[k]}
+
+    def select(self, city=None, institute=None, text=None):
+        """Index array of rows matching every given filter; `text` is a case-insensitive
+        substring test against title and skills."""
+        mask = np.ones(len(self), dtype=bool)
+        for col, value in (('city_name', city), ('full_name', institute)):
+            if value:
+                code = self._category_pos[col].get(value)
+                if code is None: return np.empty(0, dtype=np.int64)
+                mask &= self.codes[col] == code
+        needle = text.lower().replace("\x00", "").encode('utf-8') if text else b""
+        if needle:
+            hits = np.zeros(len(self), dtype=bool)
+            hits[self.strings['search'].find_rows(needle)] = True
+            mask &= hits
+        return np.flatnonzero(mask)
+
+    def by_deadline(self, n=None):
+        """Index array of dated postings, soonest deadline first."""
+        idx = np.flatnonzero(self.deadline_day >= 0)
+        return idx[np.argsort(self.deadline_day[idx], kind='stable')][:n]
+
+def _parse_deadline(raw, cache):
+    raw = str(raw).strip() if raw is not None else ""
+    if not raw or raw.lower() in ['none', 'nan', 'n/a', '']: return NO_DEADLINE
+    if raw not in cache:
+        try:
+            cache[raw] = (pd.to_datetime(raw).date() - EPOCH).days
+        except Exception:
+            cache[raw] = UNPARSED_DEADLINE
+    return cache[raw]
+
+def build_snapshot(db_path, path, version):
+    """Reads and enriches every posting once and writes the column files to `path` atomically."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT {posting_columns(conn)} FROM postings ORDER BY rowid").fetchall()
+    conn.close()
+
+    ids, deadline_day = [], []
+    strings = {col: [] for col in STRING_COLS + ['search']}
+    codes = {col: [] for col in CATEGORY_COLS}
+    categories = {col: {} for col in CATEGORY_COLS}
+    words, date_cache = Counter(), {}
+
+    for row in rows:
+        values = dict(zip(['id'] + STRING_COLS, row))
+        inst_info = lookup_institute(values['institute_code'])
+        title = str(values['title']) if values['title'] is not None else "N/A"
+        skills = str(values['skills']) if values['skills'] is not None else "N/A"
+
+        enriched = {
+            "full_name": inst_info['full'],
+            "city_name": inst_info['city'],
+            "opp_type": opportunity_type(title)
+        }
+        for col, value in enriched.items():
+            codes[col].append(categories[col].setdefault(value, len(categories[col])))
+
+        if not values['email']: values['email'] = inst_info['email']
+        for col in STRING_COLS:
+            strings[col].append(str(values[col]) if values[col] is not None else "N/A")
+        strings['search'].append(f"{title}\n{skills}".lower().replace("\x00", "") + "\x00")
+
+        ids.append(values['id'])
+        deadline_day.append(_parse_deadline(values['deadline'], date_cache))
+        words.update(title.lower().split())
+
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.build-')
+    np.save(os.path.join(tmp, 'id.npy'), np.asarray(ids, dtype=np.int64))
+    np.save(os.path.join(tmp, 'deadline_day.npy'), np.asarray(deadline_day, dtype=np.int32))
+    for col in CATEGORY_COLS:
+        np.save(os.path.join(tmp, f'{col}.npy'), np.asarray(codes[col], dtype=np.int16))
+    for col, values in strings.items():
+        StringColumn.write(os.path.join(tmp, f'{col}.bin'), os.path.join(tmp, f'{col}.off.npy'), values)
+
+    meta = {
+        "version": version,
+        "rows": len(ids),
+        "built_at": datetime.now().isoformat(timespec='seconds'),
+        "categories": {col: list(cats) for col, cats in categories.items()},
+        "trends": words.most_common(5)
+    }
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Another worker published this version first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+# --- ACCESS ---
+_STORES = {}
+
+def data_version(db_path):
+    # Changes whenever the DB file is written, and once a day so days_left/expiry stay current
+    st = os.stat(db_path)
+    return f"{date.today():%Y%m%d}-{st.st_mtime_ns}-{st.st_size}"
+
+def purge_expired(db_path):
+    # Expired postings leave the live table but are kept in the monthly history archive
+    record_new_postings(db_path)
+    conn = sqlite3.connect(db_path)
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    expired = "FROM postings WHERE deadline IS NOT NULL AND deadline != 'N/A' AND deadline < ?"
+    rows = conn.execute(f"SELECT {posting_columns(conn)} {expired}", (today_str,)).fetchall()
+    if rows:
+        archive_postings(rows, history_path(db_path))
+        conn.execute(f"DELETE {expired}", (today_str,))
+        conn.commit()
+    conn.close()
+
+def get_store(db_path=DB_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Returns the PostingsStore for the current DB contents, rebuilding the shared
+    snapshot only when the data version changes. None if there is no database."""
+    if not os.path.exists(db_path): return None
+    store = _STORES.get(db_path)
+    if store and store.version == data_version(db_path): return store
+
+    purge_expired(db_path)
+    version = data_version(db_path)
+    path = os.path.join(snapshot_dir, version)
+    for attempt in range(2):
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            build_snapshot(db_path, path, version)
+        try:
+            store = _STORES[db_path] = PostingsStore(path)
+            break
+        except FileNotFoundError:
+            # Pruned by another worker between the check and the load: build it again once
+            if attempt: raise
+
+    prune_snapshots(snapshot_dir, version)
+    return store
+
+def prune_snapshots(parent, keep, grace=SNAPSHOT_GRACE):
+    """Removes snapshot directories (and abandoned builds) other than `keep` and the one it
+    superseded, once they are older than `grace` seconds. A worker that already mapped one
+    keeps its pages; one that is still about to load it finds it on disk."""
+    cutoff = time.time() - grace
+    dirs = []
+    for name in os.listdir(parent):
+        try:
+            dirs.append((os.path.getmtime(os.path.join(parent, name)), name))
+        except FileNotFoundError:
+            pass
+    published = sorted(d for d in dirs if d[1] != keep and not d[1].startswith('.'))
+    previous = published[-1][1] if published else None
+    for mtime, name in dirs:
+        if name not in (keep, previous) and mtime < cutoff:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+# --- MEMORY BENCHMARK ---
+def benchmark(n_rows):
+    import tracemalloc
+    work = tempfile.mkdtemp(prefix='postings-bench-')
+    db_path = os.path.join(work, 'bench.db')
+
+    src = sqlite3.connect(DB_PATH)
+    base = src.execute("SELECT institute_code, title, skills, deadline, link, email, posted_on FROM postings").fetchall()
+    src.close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE postings (id INTEGER PRIMARY KEY AUTOINCREMENT, institute_code TEXT, title TEXT,
+                    skills TEXT, deadline DATE, link TEXT UNIQUE, email TEXT, posted_on DATE)""")
+    conn.executemany("INSERT INTO postings (institute_code, title, skills, deadline, link, email, posted_on) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     ((r[0], r[1], r[2], r[3], f"{r[4]}#{i}", r[5], r[6]) for i, r in ((i, base[i % len(base)]) for i in range(n_rows))))
+    conn.commit()
+    conn.close()
+
+    start = time.perf_counter()
+    store = get_store(db_path, os.path.join(work, 'snapshot'))
+    build_secs = time.perf_counter() - start
+    disk = sum(os.path.getsize(os.path.join(store.path, f)) for f in os.listdir(store.path))
+
+    _STORES.clear()
+    tracemalloc.start()
+    store = get_store(db_path, os.path.join(work, 'snapshot'))
+    store.value_counts('city_name')
+    idx = store.select(text="research")
+    store.rows(store.by_deadline(4))
+    heap = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("SELECT * FROM postings", conn)
+    conn.close()
+    df['full_name'] = df['institute_code'].map(lambda c: lookup_institute(c)['full'])
+    df['city_name'] = df['institute_code'].map(lambda c: lookup_institute(c)['city'])
+    df['opp_type'] = df['title'].map(opportunity_type)
+    df['days_left'] = "Check PDF"
+    frame = df.memory_usage(deep=True).sum()
+
+    mb = lambda b: f"{b / 2**20:,.1f} MB"
+    print(f"📊 {len(store):,} postings, snapshot built in {build_secs:.1f}s")
+    print(f"   pandas DataFrame (per worker):          {mb(frame)}")
+    print(f"   PostingsStore private heap (per worker): {mb(heap)}")
+    print(f"   Shared snapshot on disk / page cache:   {mb(disk)}")
+    print(f"   select(text='research') -> {len(idx):,} rows")
+    shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build the shared postings snapshot, or measure its memory footprint.")
+    ap.add_argument("--bench", type=int, metavar="ROWS", help="Compare memory against pandas on a synthetic DB of ROWS postings")
+    args = ap.parse_args()
+
+    if args.bench:
+        benchmark(args.bench)
+    else:
+        store = get_store()
+        print(f"✅ Snapshot {store.version}: {len(store)} postings at {store.path}" if store else f"❌ Error: Could not find {DB_PATH}")
@@ -1,11 +1,21 @@
 import os
-import requests
+import io
+import pdfplumber
 from bs4 import BeautifulSoup
 import sqlite3
 import time
 from urllib.parse import urljoin
 import urllib3
+import json
+import argparse
+import tempfile
 from datetime import datetime
+from http_archive import ArchiveWriter, ArchiveReader
+from http_fetch import fetch, content_kind, FetchRejected
+from postings_store import get_store
+from similar_index import get_similar_index
+from alerts import init_change_log, evaluate_alerts
+from history import record_new_postings
 
 # Import SOURCES from your expanded sources.py
 try:
@@ -18,8 +28,8 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "projects.db")
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
+def init_db(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS postings (
@@ -36,18 +46,23 @@ def init_db():
     conn.commit()
     conn.close()
 
-def scrape_site(source):
-    print(f"🔍 Checking: {source['institute']} in {source['city']}...")
-    try:
-        response = requests.get(source["url"], timeout=30, verify=False, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-    except Exception as e:
-        print(f"⚠️ Skipped {source['institute']}: Site unreachable")
-        return []
+KEYWORDS = ["intern", "internship", "summer", "project", "research", "jrf", "srf", "hiring", "vacancy", "recruitment", "trainee"]
+PDF_MAX_PAGES = 15
+
+def _posting(source, title, link):
+    return {
+        "institute_code": source["institute"],
+        "title": title,
+        "skills": f"Dynamic opportunities at {source['institute']}",
+        "deadline": "Check PDF",
+        "link": link,
+        "email": "contact@institute.ac.in",
+        "posted_on": datetime.now().strftime('%Y-%m-%d')
+    }
 
+def parse_html(source, response):
     soup = BeautifulSoup(response.text, "html.parser")
     results = []
-    keywords = ["intern", "internship", "summer", "project", "research", "jrf", "srf", "hiring", "vacancy", "recruitment", "trainee"]
 
     for a in soup.find_all("a", href=True):
         title = a.get_text(strip=True)
@@ -55,21 +70,50 @@ def scrape_site(source):
         
         link = urljoin(source["url"], a["href"])
         
-        if any(k in title.lower() for k in keywords):
-            results.append({
-                "institute_code": source["institute"],
-                "title": title,
-                "skills": f"Dynamic opportunities at {source['institute']}",
-                "deadline": "Check PDF",
-                "link": link,
-                "email": "contact@institute.ac.in",
-                "posted_on": datetime.now().strftime('%Y-%m-%d')
-            })
+        if any(k in title.lower() for k in KEYWORDS):
+            results.append(_posting(source, title, link))
     return results
 
-def save_to_db(data):
+def parse_pdf(source, response):
+    # A notice PDF has no anchors: take the first keyword line on each page, linked to that page
+    results = []
+    with pdfplumber.open(io.BytesIO(response.content)) as pdf:
+        for page_no, page in enumerate(pdf.pages[:PDF_MAX_PAGES], start=1):
+            for line in (page.extract_text() or "").splitlines():
+                title = " ".join(line.split())
+                if len(title) >= 12 and any(k in title.lower() for k in KEYWORDS):
+                    results.append(_posting(source, title, f"{response.url}#page={page_no}"))
+                    break
+    return results
+
+def scrape_site(source, fetch=fetch):
+    print(f"🔍 Checking: {source['institute']} in {source['city']}...")
+    try:
+        response = fetch(source["url"])
+        response.raise_for_status()
+    except FetchRejected as e:
+        print(f"⚠️ Skipped {source['institute']}: {e}")
+        return []
+    except Exception as e:
+        print(f"⚠️ Skipped {source['institute']}: Site unreachable")
+        return []
+
+    # Archived responses predate content routing, so classify them here if needed
+    kind = getattr(response, 'kind', None) or content_kind(response)
+    if kind == 'pdf':
+        try:
+            return parse_pdf(source, response)
+        except Exception:
+            print(f"⚠️ Skipped {source['institute']}: Unreadable PDF")
+            return []
+    if kind != 'html':
+        print(f"⚠️ Skipped {source['institute']}: Not an HTML page")
+        return []
+    return parse_html(source, response)
+
+def save_to_db(data, db_path=DB_PATH):
     if not data: return 0  # FIX: Return 0 instead of None if data is empty
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     count = 0
     for item in data:
@@ -89,24 +133,76 @@ def save_to_db(data):
     conn.close()
     return count
 
-if __name__ == "__main__":
-    init_db()
-    print("🚀 Starting Global Scraper for 25+ Cities...")
-    
+def run_scrape(sources, fetch=fetch, db_path=DB_PATH, delay=1.5):
+    """scrape -> parse -> dedupe -> save over `sources`; returns stats and every extracted posting."""
     # Remove duplicates from SOURCES to prevent double-scraping
     seen_urls = set()
-    UNIQUE_SOURCES = []
-    for s in SOURCES:
+    unique_sources = []
+    for s in sources:
         if s['url'] not in seen_urls:
-            UNIQUE_SOURCES.append(s)
+            unique_sources.append(s)
             seen_urls.add(s['url'])
 
-    total_new = 0
-    for source in UNIQUE_SOURCES:
-        data = scrape_site(source)
-        new_entries = save_to_db(data)
-        total_new += new_entries # This will now always have an integer to add
-        time.sleep(1.5) 
-        
+    start = time.perf_counter()
+    total_new, extracted = 0, []
+    for source in unique_sources:
+        data = scrape_site(source, fetch)
+        extracted.extend(data)
+        total_new += save_to_db(data, db_path)
+        if delay: time.sleep(delay)
+
+    elapsed = time.perf_counter() - start
+    stats = {"sites": len(unique_sources), "extracted": len(extracted), "new": total_new, "seconds": round(elapsed, 3)}
+    return stats, extracted
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Scrape all SOURCES into the postings database.")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="ARCHIVE", help="Also write every fetched response to this archive (.zip)")
+    mode.add_argument("--replay", metavar="ARCHIVE", help="Serve responses from an archive instead of the network")
+    ap.add_argument("--db", help="Postings DB to write (default: projects.db; a throwaway DB when replaying)")
+    ap.add_argument("--dump", metavar="JSON", help="Write the extracted postings here, sorted, for diffing parser changes")
+    args = ap.parse_args()
+
+    db_path = args.db or (os.path.join(tempfile.mkdtemp(prefix='scrape-replay-'), 'replay.db') if args.replay else DB_PATH)
+    init_db(db_path)
+    if db_path == DB_PATH: init_change_log(DB_PATH)
+
+    archive, fetcher, delay = None, fetch, 1.5
+    if args.record:
+        archive = ArchiveWriter(args.record)
+        fetcher = archive.wrap(fetch)
+    elif args.replay:
+        archive = ArchiveReader(args.replay)
+        fetcher, delay = archive.fetch, 0
+        print(f"📼 Replaying {len(archive)} archived responses into {db_path}")
+    else:
+        print("🚀 Starting Global Scraper for 25+ Cities...")
+
+    try:
+        stats, extracted = run_scrape(SOURCES, fetcher, db_path, delay)
+    finally:
+        if archive: archive.close()
+
     print(f"\n✅ SCRAPING COMPLETE")
-    print(f"📊 New Postings Added: {total_new}")
\ No newline at end of file
+    print(f"📊 New Postings Added: {stats['new']}")
+    if args.record: print(f"📼 Archived {len(archive.entries)} responses to {args.record}")
+    if args.replay:
+        rate = stats['sites'] / stats['seconds'] if stats['seconds'] else 0
+        print(f"⏱️ {stats['sites']} sites, {stats['extracted']} postings extracted in {stats['seconds']}s ({rate:.1f} sites/sec)")
+    if args.dump:
+        # posted_on is the run date, so leave it out to keep dumps comparable across days
+        rows = sorted(({k: v for k, v in item.items() if k != 'posted_on'} for item in extracted), key=lambda r: (r['link'], r['title']))
+        with open(args.dump, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=1, ensure_ascii=False)
+
+    if db_path == DB_PATH:
+        print(f"🗄️ History: {record_new_postings(DB_PATH)} postings archived")
+        checked, alerted = evaluate_alerts(DB_PATH)
+        print(f"🔔 Saved searches: {checked} new/changed postings checked, {alerted} alerts queued")
+
+        # Refresh the shared snapshot and similar-postings vectors now; only changed postings are re-vectorised
+        store = get_store(DB_PATH)
+        if store:
+            index = get_similar_index(store)
+            print(f"🧭 Similar index: {index.meta['reindexed']} of {len(index)} postings re-indexed")
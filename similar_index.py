@@ -0,0 +1,243 @@
+import os
+import re
+import json
+import math
+import zlib
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from collections import Counter
+from datetime import datetime
+from postings_store import prune_snapshots
+
+# CONFIGURATION
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_DIR = os.path.join(BASE_DIR, 'similar')
+
+DIM = 1024           # hashed feature space
+N_TABLES = 8         # LSH hash tables
+N_BITS = 12          # random hyperplanes per table
+SEED = 517
+TOP_K = 5
+REFIT_RATIO = 0.25   # re-weight every vector once this share of the corpus changed since the last full fit
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# --- VECTORISATION ---
+def _features(text):
+    words = [w for w in TOKEN_RE.findall(text.lower()) if len(w) > 1]
+    feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        feats += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return feats
+
+def term_counts(text):
+    # crc32 rather than hash(): dims must agree across processes and restarts
+    return Counter(zlib.crc32(f.encode('utf-8')) % DIM for f in _features(text))
+
+def content_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+def _planes():
+    return np.random.default_rng(SEED).standard_normal((N_TABLES, DIM, N_BITS)).astype(np.float32)
+
+def _vectorise(texts, doc_freq, n_docs):
+    """Sublinear TF x smoothed IDF over hashed word, word-bigram and char-trigram features, L2-normalised."""
+    idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for dim, tf in term_counts(text).items():
+            vectors[row, dim] = (1 + math.log(tf)) * idf[dim]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _signatures(vectors, planes):
+    bits = np.einsum('nd,ldb->nlb', vectors, planes) > 0
+    return (bits * (1 << np.arange(N_BITS))).sum(axis=-1).astype(np.int64)
+
+def _posting_text(store, i):
+    return f"{store.strings['title'][i]}\n{store.strings['skills'][i]}"
+
+# --- INDEX ---
+class SimilarIndex:
+    """Precomputed posting vectors plus a random-projection LSH index over them.
+
+    Rows line up with the PostingsStore snapshot of the same version, so a
+    store position is also an index position."""
+
+    FILES = ['ids', 'hashes', 'vectors', 'doc_freq', 'sigs', 'order', 'sorted_sigs']
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.version = self.meta['version']
+        for name in self.FILES:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        self.planes = _planes()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _candidates(self, sig):
+        found = []
+        for t in range(N_TABLES):
+            keys = self.sorted_sigs[t]
+            lo, hi = np.searchsorted(keys, sig[t], 'left'), np.searchsorted(keys, sig[t], 'right')
+            found.append(self.order[t][lo:hi])
+        return np.unique(np.concatenate(found))
+
+    def _probe(self, sig):
+        # Multi-probe: also visit every bucket one bit-flip away
+        found = [self._candidates(sig)]
+        for bit in range(N_BITS):
+            found.append(self._candidates(sig ^ (1 << bit)))
+        return np.unique(np.concatenate(found))
+
+    def query_vector(self, vec, k=TOP_K, skip=None):
+        """Top-k (position, cosine) pairs for a normalised vector; `skip` masks out positions."""
+        if k < 1 or not len(self) or not vec.any(): return []
+        sig = _signatures(vec[None, :], self.planes)[0]
+        cand = self._candidates(sig)
+        if skip is not None: cand = cand[~skip[cand]]
+        if len(cand) < k:
+            cand = self._probe(sig)
+            if skip is not None: cand = cand[~skip[cand]]
+        if len(cand) < k:
+            cand = np.arange(len(self)) if skip is None else np.flatnonzero(~skip)
+
+        scores = self.vectors[cand] @ vec
+        top = np.argsort(-scores, kind='stable')[:k]
+        return [(int(cand[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def similar_to(self, pos, k=TOP_K, skip=None):
+        skip = np.zeros(len(self), dtype=bool) if skip is None else skip.copy()
+        skip[pos] = True
+        return self.query_vector(np.asarray(self.vectors[pos]), k, skip)
+
+    def query_text(self, text, k=TOP_K):
+        n_docs = self.meta['fit_docs']
+        return self.query_vector(_vectorise([text], np.asarray(self.doc_freq), n_docs)[0], k)
+
+# --- BUILD / INCREMENTAL SYNC ---
+def sync_index(store, path, prev=None):
+    """Writes the index for `store` to `path`, re-vectorising only postings whose
+    id or title/skills changed since `prev`."""
+    n = len(store)
+    texts = [_posting_text(store, i) for i in range(n)]
+    ids = np.asarray(store.ids, dtype=np.int64)
+    hashes = np.asarray([content_hash(t) for t in texts], dtype=np.int64)
+    planes = _planes()
+
+    reused_new, reused_old = [], []
+    if prev is not None and len(prev):
+        prev_pos = {int(i): p for p, i in enumerate(prev.ids)}
+        for pos in range(n):
+            p = prev_pos.get(int(ids[pos]))
+            if p is not None and prev.hashes[p] == hashes[pos]:
+                reused_new.append(pos)
+                reused_old.append(p)
+    reused_new, reused_old = np.asarray(reused_new, dtype=np.int64), np.asarray(reused_old, dtype=np.int64)
+    changed = np.setdiff1d(np.arange(n), reused_new)
+
+    changed_since_fit = (prev.meta['changed_since_fit'] if prev is not None else 0) + len(changed) + (len(prev) - len(reused_old) if prev is not None else 0)
+    refit = prev is None or not len(reused_new) or changed_since_fit > REFIT_RATIO * max(n, 1)
+
+    if refit:
+        doc_freq = np.zeros(DIM, dtype=np.int64)
+        for text in texts: doc_freq[list(term_counts(text))] += 1
+        vectors = _vectorise(texts, doc_freq, n)
+        sigs = _signatures(vectors, planes) if n else np.zeros((0, N_TABLES), dtype=np.int64)
+        fit_docs, changed_since_fit, reindexed = n, 0, n
+    else:
+        # Document frequencies follow the corpus; untouched vectors keep their weights until the next refit
+        dropped = np.setdiff1d(np.arange(len(prev)), reused_old)
+        doc_freq = np.asarray(prev.doc_freq).copy()
+        doc_freq -= np.count_nonzero(prev.vectors[dropped], axis=0)
+        for pos in changed: doc_freq[list(term_counts(texts[pos]))] += 1
+        fit_docs = prev.meta['fit_docs'] - len(dropped) + len(changed)
+
+        vectors = np.zeros((n, DIM), dtype=np.float32)
+        sigs = np.zeros((n, N_TABLES), dtype=np.int64)
+        vectors[reused_new] = prev.vectors[reused_old]
+        sigs[reused_new] = prev.sigs[reused_old]
+        if len(changed):
+            vectors[changed] = _vectorise([texts[p] for p in changed], doc_freq, fit_docs)
+            sigs[changed] = _signatures(vectors[changed], planes)
+        reindexed = len(changed)
+
+    order = np.argsort(sigs.T, axis=1, kind='stable')
+    sorted_sigs = np.take_along_axis(sigs.T, order, axis=1)
+
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.build-')
+    arrays = {'ids': ids, 'hashes': hashes, 'vectors': vectors, 'doc_freq': doc_freq,
+              'sigs': sigs, 'order': order, 'sorted_sigs': sorted_sigs}
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), arr)
+    meta = {
+        "version": store.version,
+        "rows": n,
+        "reindexed": int(reindexed),
+        "fit_docs": int(fit_docs),
+        "changed_since_fit": int(changed_since_fit),
+        "built_at": datetime.now().isoformat(timespec='seconds')
+    }
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+# --- ACCESS ---
+_INDEXES = {}
+
+def _latest(index_dir):
+    built = []
+    for name in os.listdir(index_dir):
+        meta = os.path.join(index_dir, name, 'meta.json')
+        if not name.startswith('.') and os.path.exists(meta):
+            built.append((os.path.getmtime(meta), name))
+    return os.path.join(index_dir, max(built)[1]) if built else None
+
+def get_similar_index(store, index_dir=INDEX_DIR):
+    """Returns the SimilarIndex matching `store.version`, syncing from the newest
+    index on disk when the postings have changed."""
+    index = _INDEXES.get(index_dir)
+    if index and index.version == store.version: return index
+
+    path = os.path.join(index_dir, store.version)
+    for attempt in range(2):
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            os.makedirs(index_dir, exist_ok=True)
+            sync_index(store, path, _load_previous(index_dir))
+        try:
+            index = _INDEXES[index_dir] = SimilarIndex(path)
+            break
+        except FileNotFoundError:
+            # Pruned by another worker between the check and the load: sync it again once
+            if attempt: raise
+
+    prune_snapshots(index_dir, store.version)
+    return index
+
+def _load_previous(index_dir):
+    latest = _latest(index_dir)
+    try:
+        return SimilarIndex(latest) if latest else None
+    except FileNotFoundError:
+        return None   # pruned meanwhile; a full refit is still correct
+
+if __name__ == "__main__":
+    from postings_store import get_store
+    store = get_store()
+    if not store:
+        print("❌ Error: No postings database found.")
+    else:
+        index = get_similar_index(store)
+        print(f"✅ Similar-postings index {index.version}: {len(index)} postings, {index.meta['reindexed']} re-indexed")
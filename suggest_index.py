@@ -0,0 +1,103 @@
+import re
+import html
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from institutes import INST_MAP
+
+# CONFIGURATION
+LIMIT = 8
+PRECOMPUTED_PREFIX = 3    # prefixes up to this length keep a ready-made top list
+MAX_TITLE_TERMS = 2000
+STOPWORDS = {'the', 'and', 'for', 'with', 'from', 'are', 'this', 'that', 'post', 'posts', 'invited', 'applications',
+             'application', 'under', 'walk', 'interview', 'notice', 'notification', 'advertisement', 'position', 'positions'}
+WORD_RE = re.compile(r"[a-z][a-z0-9+#.-]*[a-z0-9+#]")
+# scraper.py stores this when a page lists no skills; it is not a skill anyone searches for
+PLACEHOLDER_SKILLS = "dynamic opportunities at "
+# Entity names left in scraped titles once the '&' and ';' are stripped away
+ENTITY_REMNANTS = {'nbsp', 'quot', 'apos', 'ndash', 'mdash', 'lsquo', 'rsquo', 'ldquo', 'rdquo', 'hellip'}
+
+class SuggestIndex:
+    """Sorted-array prefix index over skills, institutes, cities and frequent title terms.
+
+    Each entry is {"text", "kind", "value", "count"}: `value` is what the search
+    form should receive (e.g. the full institute name for a code). Multi-word
+    labels are also reachable from the start of each later word."""
+
+    def __init__(self, store):
+        self.version = store.version if store else None
+        self.entries = []
+        entry_pos = {}
+
+        def add(text, kind, value, count):
+            key = (kind, text, value)
+            if key in entry_pos:
+                self.entries[entry_pos[key]]['count'] += count
+            else:
+                entry_pos[key] = len(self.entries)
+                self.entries.append({"text": text, "kind": kind, "value": value, "count": count})
+
+        inst_counts = store.value_counts('full_name') if store else {}
+        city_counts = store.value_counts('city_name') if store else {}
+        for code, info in INST_MAP.items():
+            add(info['full'], 'institute', info['full'], 0)
+            add(code, 'institute', info['full'], inst_counts.get(info['full'], 0))
+        for full, count in inst_counts.items(): add(full, 'institute', full, count)
+        for info in INST_MAP.values(): add(info['city'], 'city', info['city'], 0)
+        for city, count in city_counts.items(): add(city, 'city', city, count)
+
+        if store:
+            skills, words = Counter(), Counter()
+            for i in range(len(store)):
+                for skill in {s.strip().lower() for s in store.strings['skills'][i].split(',')}:
+                    if 2 <= len(skill) <= 40 and skill != 'n/a' and not skill.startswith(PLACEHOLDER_SKILLS):
+                        skills[skill] += 1
+                title = html.unescape(store.strings['title'][i]).lower()
+                words.update(w for w in set(WORD_RE.findall(title))
+                             if len(w) > 3 and w not in STOPWORDS and w not in ENTITY_REMNANTS)
+            for skill, count in skills.items(): add(skill, 'skill', skill, count)
+            for word, count in words.most_common(MAX_TITLE_TERMS):
+                if count > 1 and ('skill', word, word) not in entry_pos: add(word, 'term', word, count)
+
+        pairs = []
+        for pos, entry in enumerate(self.entries):
+            words = entry['text'].lower().split()
+            pairs.extend((" ".join(words[i:]), pos) for i in range(len(words)))
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.positions = [p for _, p in pairs]
+
+        # Short prefixes match too many keys to rank per request, so rank them once here
+        self.top = {}
+        buckets = {}
+        for key, pos in pairs:
+            for n in range(1, min(PRECOMPUTED_PREFIX, len(key)) + 1):
+                buckets.setdefault(key[:n], set()).add(pos)
+        for prefix, found in buckets.items():
+            self.top[prefix] = self._rank(found, LIMIT)
+
+    def _rank(self, positions, limit):
+        best = heapq.nlargest(limit, positions, key=lambda p: (self.entries[p]['count'], -p))
+        return [self.entries[p] for p in best]
+
+    def suggest(self, q, limit=LIMIT):
+        q = " ".join(q.lower().split())
+        if not q: return []
+        if len(q) <= PRECOMPUTED_PREFIX and limit <= LIMIT:
+            return self.top.get(q, [])[:limit]
+
+        found = set()
+        i = bisect_left(self.keys, q)
+        while i < len(self.keys) and self.keys[i].startswith(q):
+            found.add(self.positions[i])
+            i += 1
+        return self._rank(found, limit)
+
+_CACHE = {}
+
+def get_suggest_index(store):
+    # Only rebuilt when the postings data version changes
+    version = store.version if store else None
+    if 'index' not in _CACHE or _CACHE['index'].version != version:
+        _CACHE['index'] = SuggestIndex(store)
+    return _CACHE['index']